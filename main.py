@@ -1,6 +1,29 @@
-from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter, generate_sales_report
+from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter, generate_sales_report, TransactionIndex
 from utils.data_processor import run_analytics
 from utils.api_handler import fetch_all_products, create_product_mapping, enrich_sales_data, save_enriched_data
+from utils.scheduler import run_in_background
+from utils.partition_handler import run_month_to_date
+import sys
+
+# Month-to-date report over one sales file per store per day
+# Usage: python main.py --month-to-date data/sales [YYYY-MM-DD]
+def month_to_date_report(source, as_of=None):
+    try:
+        merged, _ = run_month_to_date(source, as_of=as_of)
+        if not merged['transaction_count']:
+            print("Stopping process: No data available.")
+            return
+        # Partitioned runs are not enriched, so the API section is left out
+        generate_sales_report(
+            transactions=[],
+            enriched_transactions=None,
+            output_file='output/month_to_date_report.txt',
+            total_records=merged['transaction_count']
+        )
+        print("\n[10/10] Process Complete!")
+
+    except Exception as e:
+        print(f"\n✕ Error: {e}")
 
 def main():
     print(r"""
@@ -20,24 +43,47 @@ def main():
         if not raw_lines:
             print("Stopping process: No data available.")
             return
+
+        # [6/10] API FETCH (background)
+        # The catalog does not depend on the sales file, so it is fetched
+        # while the data is parsed, filtered (user input) and analysed.
+        api_messages = []
+        api_future = run_in_background(fetch_all_products, api_messages.append)
+
         # [2/10] PARSE THE DATA
         parsed_data = parse_transactions(raw_lines)
-        valid_transactions, invalid_count, filter_summary = validate_and_filter(parsed_data)
+        index = TransactionIndex(on_duplicate='drop')
+        valid_transactions, invalid_count, filter_summary = validate_and_filter(
+            parsed_data, index=index)
         # [5/10] ANALYSIS
         run_analytics(valid_transactions)
 
         # [6-8] API & ENRICHMENT
-        api_raw = fetch_all_products()
+        try:
+            api_raw = api_future.result()
+        finally:
+            for message in api_messages:
+                print(message)
         product_mapping = create_product_mapping(api_raw)
         enriched_data = enrich_sales_data(valid_transactions, product_mapping)
-        save_enriched_data(enriched_data)
-        
-        # [9/10] Generating report (ALL FIELDS)
-        generate_sales_report(
-            transactions=valid_transactions,
-            enriched_transactions=enriched_data
-        )
-        
+
+        # [8-9] Saving the enriched data runs alongside report generation;
+        # both log into buffers that are printed in step order afterwards
+        save_messages = []
+        report_messages = []
+        save_future = run_in_background(
+            save_enriched_data, enriched_data, 'data/enriched_sales_data.txt', save_messages.append)
+        try:
+            generate_sales_report(
+                transactions=valid_transactions,
+                enriched_transactions=enriched_data,
+                log=report_messages.append
+            )
+            save_future.result()
+        finally:
+            for message in save_messages + report_messages:
+                print(message)
+
         # 10/10 PROCESS COMPLETED
         print("\n[10/10] Process Complete!")
 
@@ -45,4 +91,7 @@ def main():
         print(f"\n✕ Error: {e}")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 2 and sys.argv[1] == '--month-to-date':
+        month_to_date_report(sys.argv[2], sys.argv[3] if len(sys.argv) > 3 else None)
+    else:
+        main()
@@ -0,0 +1,164 @@
+import os
+
+from utils.data_processor import (build_aggregate, merge_aggregates, run_analytics,
+                                  run_analytics_from_aggregate, customer_analysis,
+                                  daily_sales_trend, low_performing_products)
+from utils.file_handler import TransactionIndex, _transaction_key, validate_data, parse_transactions
+from utils.partition_handler import load_partition_aggregates, run_month_to_date
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+
+TRANSACTIONS = [
+    {'TransactionID': 'T001', 'Date': '2024-12-01', 'ProductID': 'P101', 'ProductName': 'Mouse',
+     'Quantity': 2, 'UnitPrice': 500.0, 'CustomerID': 'C001', 'Region': 'North'},
+    {'TransactionID': 'T002', 'Date': '2024-12-01', 'ProductID': 'P102', 'ProductName': 'Laptop',
+     'Quantity': 1, 'UnitPrice': 40000.0, 'CustomerID': 'C002', 'Region': 'South'},
+    {'TransactionID': 'T003', 'Date': '2024-12-02', 'ProductID': 'P101', 'ProductName': 'Mouse',
+     'Quantity': 3, 'UnitPrice': 500.0, 'CustomerID': 'C001', 'Region': 'North'},
+    {'TransactionID': 'T004', 'Date': '2024-12-02', 'ProductID': 'P103', 'ProductName': 'Cable',
+     'Quantity': 12, 'UnitPrice': 100.0, 'CustomerID': 'C001', 'Region': 'South'},
+]
+
+
+# Helper function to write a partition file
+def write_partition(folder, name, rows):
+    path = os.path.join(folder, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join([HEADER] + rows) + "\n")
+    return path
+
+
+# ========================================================================
+
+def test_run_analytics_matches_original_results():
+    results = run_analytics(TRANSACTIONS)
+    assert results['total_revenue'] == 43700.0
+    assert results['region_wise_performance'] == {
+        'South': {'total_sales': 41200.0, 'transaction_count': 2, 'percentage': 94.28},
+        'North': {'total_sales': 2500.0, 'transaction_count': 2, 'percentage': 5.72},
+    }
+    assert results['top_selling_products'] == [
+        ('Cable', 12, 1200.0), ('Mouse', 5, 2500.0), ('Laptop', 1, 40000.0)]
+    assert results['top_customers']['C001'] == {
+        'total_spent': 3700.0, 'purchase_count': 3,
+        'products_bought': ['Mouse', 'Cable'], 'avg_order_value': 1233.33}
+    assert list(results['top_customers']) == ['C002', 'C001']
+    assert results['daily_sales_trend'] == {
+        '2024-12-01': {'revenue': 41000.0, 'transaction_count': 2, 'unique_customers': 2},
+        '2024-12-02': {'revenue': 2700.0, 'transaction_count': 2, 'unique_customers': 1},
+    }
+    assert results['peak_sales_day'] == ('2024-12-01', 41000.0, 2)
+    assert results['low_performers'] == [('Laptop', 1, 40000.0), ('Mouse', 5, 2500.0)]
+
+
+def test_public_metrics_use_the_same_aggregate():
+    assert customer_analysis(TRANSACTIONS)['C001']['products_bought'] == ['Mouse', 'Cable']
+    assert daily_sales_trend(TRANSACTIONS)['2024-12-02']['unique_customers'] == 1
+    assert low_performing_products(TRANSACTIONS, threshold=2) == [('Laptop', 1, 40000.0)]
+
+
+def test_merged_aggregates_match_single_aggregate():
+    expected = dict(run_analytics(TRANSACTIONS))
+    merged = merge_aggregates([build_aggregate(TRANSACTIONS[:2]),
+                               build_aggregate(TRANSACTIONS[2:])])
+    assert merged['transaction_count'] == 4
+    assert dict(run_analytics_from_aggregate(merged)) == expected
+
+
+# ========================================================================
+
+def test_transaction_key_is_compact_and_distinct():
+    assert _transaction_key('T018') == 1018
+    assert _transaction_key('T18') == 118
+    assert _transaction_key('T018') != _transaction_key('T18')
+    hashed = _transaction_key('X-9')
+    assert hashed < 0 and hashed == _transaction_key('X-9')
+    assert hashed != _transaction_key('X-8')
+
+
+def test_duplicates_are_checked_after_validation():
+    rows = ["T900|2024-12-01|P101|A|0|10|C001|North",
+            "T900|2024-12-01|P101|A|2|10|C001|North",
+            "T900|2024-12-01|P101|A|3|10|C001|North"]
+    index = TransactionIndex('drop')
+    valid, _, invalid_count = validate_data(parse_transactions(rows), index)
+    assert [tx['Quantity'] for tx in valid] == [2]
+    assert (invalid_count, index.duplicate_count, index.corrected_count) == (1, 1, 0)
+
+    index = TransactionIndex('replace')
+    valid, _, _ = validate_data(parse_transactions(rows), index)
+    assert [tx['Quantity'] for tx in valid] == [3]
+    assert (index.duplicate_count, index.corrected_count) == (0, 1)
+
+
+def test_shared_index_returns_only_new_records():
+    index = TransactionIndex()
+    first, _, _ = validate_data(TRANSACTIONS[:3], index)
+    second, _, _ = validate_data(TRANSACTIONS[2:], index)
+    assert len(first) == 3
+    assert [tx['TransactionID'] for tx in second] == ['T004']
+    assert index.duplicate_count == 1 and len(index) == 4
+
+
+# ========================================================================
+
+def test_partition_cache_reuse_and_invalidation(tmp_path):
+    folder = str(tmp_path)
+    cache_file = os.path.join(folder, 'cache.json')
+    north = write_partition(folder, 'sales_data_North_2024-12-01.txt',
+                            ["T001|2024-12-01|P101|Mouse|2|500|C001|North"])
+    write_partition(folder, 'sales_data_South_2024-12-01.txt',
+                    ["T002|2024-12-01|P102|Laptop|1|40000|C002|South"])
+
+    _, summary = load_partition_aggregates(folder, cache_file=cache_file)
+    assert (summary['reused'], summary['reprocessed']) == (0, 2)
+    aggregates, summary = load_partition_aggregates(folder, cache_file=cache_file)
+    assert (summary['reused'], summary['reprocessed']) == (2, 0)
+    assert merge_aggregates(aggregates)['total_revenue'] == 41000.0
+
+    # Rewriting one file with a new mtime reprocesses only that file
+    write_partition(folder, 'sales_data_North_2024-12-01.txt',
+                    ["T001|2024-12-01|P101|Mouse|4|500|C001|North"])
+    stat = os.stat(north)
+    os.utime(north, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    aggregates, summary = load_partition_aggregates(folder, cache_file=cache_file)
+    assert (summary['reused'], summary['reprocessed']) == (1, 1)
+    assert merge_aggregates(aggregates)['total_revenue'] == 42000.0
+
+
+def test_cross_file_duplicates_and_corrections(tmp_path):
+    folder = str(tmp_path)
+    cache_file = os.path.join(folder, 'cache.json')
+    write_partition(folder, 'sales_data_North_2024-12-01.txt',
+                    ["T001|2024-12-01|P101|Mouse|2|500|C001|North",
+                     "T002|2024-12-01|P102|Laptop|1|40000|C002|North"])
+    # A later export that repeats T002 with a corrected quantity
+    write_partition(folder, 'sales_data_North_2024-12-05.txt',
+                    ["T002|2024-12-01|P102|Laptop|2|40000|C002|North"])
+
+    drop_cache = os.path.join(folder, 'drop.json')
+    merged, summary = run_month_to_date(folder, '2024-12-31', cache_file=drop_cache,
+                                        on_duplicate='drop')
+    assert merged['transaction_count'] == 2
+    assert merged['total_revenue'] == 41000.0
+    assert summary['duplicates_across_files'] == 1
+
+    merged, summary = run_month_to_date(folder, '2024-12-31', cache_file=cache_file)
+    assert merged['transaction_count'] == 2
+    assert merged['total_revenue'] == 81000.0
+    assert summary['corrections_across_files'] == 1
+
+    # The deduplicated aggregate is cached, so nothing is read again
+    merged, summary = run_month_to_date(folder, '2024-12-31', cache_file=cache_file)
+    assert (summary['reused'], summary['reprocessed']) == (2, 0)
+    assert merged['total_revenue'] == 81000.0
+
+
+def test_month_to_date_rejects_bad_dates(tmp_path):
+    for bad in ['2024-12', '12/31/2024']:
+        try:
+            run_month_to_date(str(tmp_path), bad, cache_file=os.path.join(str(tmp_path), 'c.json'))
+        except ValueError as e:
+            assert 'YYYY-MM-DD' in str(e)
+        else:
+            raise AssertionError(f"{bad} was accepted")
@@ -1,12 +1,14 @@
 import requests
 
 #Function to fetch all products from DummyJSON with limit 100
-def fetch_all_products():
+def fetch_all_products(log=print):
     """
     Fetches all products from DummyJSON API and returns only required fields.
+    Messages go through log, so a background fetch can hold them until the
+    main thread is ready to show them.
     """
     url = "https://dummyjson.com/products?limit=100"
-    print("\n[6/10] Fetching product data from API...")
+    log("\n[6/10] Fetching product data from API...")
     try:
         # 1. STEP: Make the GET request
         response = requests.get(url, timeout=10)
@@ -25,14 +27,14 @@ def fetch_all_products():
                     'rating': p.get('rating')
                 }
                 cleaned_products.append(formatted_product)
-            print(
+            log(
                 f"✓ Success: Fetched and formatted {len(cleaned_products)} products.")
             return cleaned_products
         else:
-            print(f"✕ API Error: Status {response.status_code}")
+            log(f"✕ API Error: Status {response.status_code}")
             return []
     except requests.exceptions.RequestException as e:
-        print(f"✕ Connection Error: {e}")
+        log(f"✕ Connection Error: {e}")
         return []
 
 # ====================================================================================
@@ -97,11 +99,12 @@ def enrich_sales_data(filtered_list, product_mapping):
 # ====================================================================================
 
 # Helper function to save enriched data
-def save_enriched_data(enriched_list, output_file='data/enriched_sales_data.txt'):
+def save_enriched_data(enriched_list, output_file='data/enriched_sales_data.txt', log=print):
     """
     Save enriched transaction data to a text file.
+    Messages go through log (see fetch_all_products).
     """
-    print("\n[8/10] Saving enriched data...")
+    log("\n[8/10] Saving enriched data...")
     # 1. Writing to file
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -127,9 +130,9 @@ def save_enriched_data(enriched_list, output_file='data/enriched_sales_data.txt'
                 ]
                 f.write("|".join(row) + "\n")
 
-        print(
+        log(
             f"✓ Success: {output_file} has been created with {len(enriched_list)} rows.")
     except Exception as e:
-        print(f"✕ File writing failed: {e}")
+        log(f"✕ File writing failed: {e}")
 
     return enriched_list
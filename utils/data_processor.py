@@ -1,10 +1,91 @@
 
+# Build a mergeable aggregate snapshot of the transactions
+def build_aggregate(transactions):
+    """
+    Summarises transactions into plain totals that every analytic below is
+    computed from. Aggregates of different partitions can be merged with
+    merge_aggregates. Daily customers are a set and products_bought is a
+    dict used as an ordered set, so lookups stay O(1).
+    """
+    aggregate = {
+        'transaction_count': 0,
+        'total_revenue': 0.0,
+        'regions': {},
+        'products': {},
+        'customers': {},
+        'daily': {}
+    }
+    for tx in transactions:
+        revenue = tx['Quantity'] * tx['UnitPrice']
+        aggregate['transaction_count'] += 1
+        aggregate['total_revenue'] += revenue
+        # 1. STEP: Region totals
+        region = aggregate['regions'].setdefault(
+            tx['Region'], {'total_sales': 0.0, 'transaction_count': 0})
+        region['total_sales'] += revenue
+        region['transaction_count'] += 1
+        # 2. STEP: Product totals
+        product = aggregate['products'].setdefault(
+            tx['ProductName'], {'total_qty': 0, 'total_revenue': 0.0})
+        product['total_qty'] += tx['Quantity']
+        product['total_revenue'] += revenue
+        # 3. STEP: Customer totals (Requirement: Unique products)
+        customer = aggregate['customers'].setdefault(
+            tx['CustomerID'], {'total_spent': 0.0, 'purchase_count': 0, 'products_bought': {}})
+        customer['total_spent'] += revenue
+        customer['purchase_count'] += 1
+        customer['products_bought'][tx['ProductName']] = None
+        # 4. STEP: Daily totals
+        day = aggregate['daily'].setdefault(
+            tx['Date'], {'revenue': 0.0, 'transaction_count': 0, 'customers': set()})
+        day['revenue'] += revenue
+        day['transaction_count'] += 1
+        day['customers'].add(tx['CustomerID'])
+    return aggregate
+
+
+# Merge several partition aggregates into one
+def merge_aggregates(aggregates):
+    """
+    Combines aggregate snapshots from build_aggregate into a single one.
+    """
+    merged = build_aggregate([])
+    for agg in aggregates:
+        merged['transaction_count'] += agg['transaction_count']
+        merged['total_revenue'] += agg['total_revenue']
+        for name, data in agg['regions'].items():
+            region = merged['regions'].setdefault(
+                name, {'total_sales': 0.0, 'transaction_count': 0})
+            region['total_sales'] += data['total_sales']
+            region['transaction_count'] += data['transaction_count']
+        for name, data in agg['products'].items():
+            product = merged['products'].setdefault(
+                name, {'total_qty': 0, 'total_revenue': 0.0})
+            product['total_qty'] += data['total_qty']
+            product['total_revenue'] += data['total_revenue']
+        for c_id, data in agg['customers'].items():
+            customer = merged['customers'].setdefault(
+                c_id, {'total_spent': 0.0, 'purchase_count': 0, 'products_bought': {}})
+            customer['total_spent'] += data['total_spent']
+            customer['purchase_count'] += data['purchase_count']
+            customer['products_bought'].update(data['products_bought'])
+        for date, data in agg['daily'].items():
+            day = merged['daily'].setdefault(
+                date, {'revenue': 0.0, 'transaction_count': 0, 'customers': set()})
+            day['revenue'] += data['revenue']
+            day['transaction_count'] += data['transaction_count']
+            day['customers'].update(data['customers'])
+    return merged
+
+
+# ========================================================================
+
 # Calculate Total Revenue
 def calculate_total_revenue(transactions):
-    total_revenue = 0.0
-    for tx in transactions:
-        total_revenue += (tx['Quantity'] * tx['UnitPrice'])
-    return round(total_revenue, 2)
+    return _total_revenue(build_aggregate(transactions))
+
+def _total_revenue(aggregate):
+    return round(aggregate['total_revenue'], 2)
 
 
 # Region-wise sales analysis
@@ -12,23 +93,21 @@ def region_wise_sales(transactions):
     """
     Analyzes sales by region
     """
+    return _region_performance(build_aggregate(transactions))
+
+def _region_performance(aggregate):
     # 1. Calculate Total Revenue first for percentage math
-    overall_total = calculate_total_revenue(transactions)
-    # 2. Use a plain dictionary to store results
+    overall_total = _total_revenue(aggregate)
+    # 2. Copy the region totals and calculate percentages
     region_stats = {}
-    for tx in transactions:
-        region = tx['Region']
-        revenue = tx['Quantity'] * tx['UnitPrice']
-        if region not in region_stats:
-            region_stats[region] = {'total_sales': 0.0, 'transaction_count': 0}
-        region_stats[region]['total_sales'] += revenue
-        region_stats[region]['transaction_count'] += 1
-    # 3. Calculate percentages
-    for region in region_stats:
-        sales = region_stats[region]['total_sales']
-        percent = (sales / overall_total) * 100
-        region_stats[region]['percentage'] = round(percent, 2)
-    # 4. Sort by total_sales descending
+    for region, data in aggregate['regions'].items():
+        percent = (data['total_sales'] / overall_total) * 100
+        region_stats[region] = {
+            'total_sales': data['total_sales'],
+            'transaction_count': data['transaction_count'],
+            'percentage': round(percent, 2)
+        }
+    # 3. Sort by total_sales descending
     sorted_regions = sorted(region_stats.items(),
                             key=lambda item: item[1]['total_sales'],
                             reverse=True)
@@ -40,23 +119,16 @@ def top_selling_products(transactions, n=5):
     """
     Finds top n products by total quantity sold.
     """
-    # 1. Create a dictionary to store totals for each product
-    product_totals = {}
-    for tx in transactions:
-        name = tx['ProductName']
-        qty = tx['Quantity']
-        revenue = tx['Quantity'] * tx['UnitPrice']
-        if name not in product_totals:
-            product_totals[name] = {'total_qty': 0, 'total_revenue': 0.0}
-        product_totals[name]['total_qty'] += qty
-        product_totals[name]['total_revenue'] += revenue
-    # 2. Convert dictionary to a list of tuples for sorting
+    return _top_products(build_aggregate(transactions), n)
+
+def _top_products(aggregate, n):
+    # 1. Convert product totals to a list of tuples for sorting
     product_list = []
-    for name, data in product_totals.items():
+    for name, data in aggregate['products'].items():
         product_list.append((name, data['total_qty'], data['total_revenue']))
-    # 3. Sort by TotalQuantity in descending order
+    # 2. Sort by TotalQuantity in descending order
     sorted_products = sorted(product_list, key=lambda x: x[1], reverse=True)
-    # 4. Return only the top 'n' items
+    # 3. Return only the top 'n' items
     return sorted_products[:n]
 
 
@@ -65,28 +137,18 @@ def customer_analysis(transactions):
     """
     Analyzes customer purchase patterns.
     """
-    customer_stats = {}
-    for tx in transactions:
-        c_id = tx['CustomerID']
-        spent = tx['Quantity'] * tx['UnitPrice']
-        product = tx['ProductName']
-        if c_id not in customer_stats:
-            customer_stats[c_id] = {
-                'total_spent': 0.0,
-                'purchase_count': 0,
-                'products_bought': []
-            }
-        customer_stats[c_id]['total_spent'] += spent
-        customer_stats[c_id]['purchase_count'] += 1
-        # Only add product if it's not already in their list (Requirement: Unique products)
-        if product not in customer_stats[c_id]['products_bought']:
-            customer_stats[c_id]['products_bought'].append(product)
-    # Calculate Average Order Value
-    for c_id in customer_stats:
-        stats = customer_stats[c_id]
-        stats['avg_order_value'] = round(
-            stats['total_spent'] / stats['purchase_count'], 2)
+    return _customer_stats(build_aggregate(transactions))
 
+def _customer_stats(aggregate):
+    customer_stats = {}
+    for c_id, data in aggregate['customers'].items():
+        customer_stats[c_id] = {
+            'total_spent': data['total_spent'],
+            'purchase_count': data['purchase_count'],
+            'products_bought': list(data['products_bought']),
+            # Calculate Average Order Value
+            'avg_order_value': round(data['total_spent'] / data['purchase_count'], 2)
+        }
     # Sort by total_spent descending
     sorted_customers = sorted(customer_stats.items(),
                               key=lambda x: x[1]['total_spent'],
@@ -99,32 +161,17 @@ def daily_sales_trend(transactions):
     """
     Groups sales by date to see revenue and customer activity.
     """
-    # 1. Create a dictionary to hold daily data
-    daily_data = {}
-    for tx in transactions:
-        date = tx['Date']
-        revenue = tx['Quantity'] * tx['UnitPrice']
-        customer = tx['CustomerID']
-        # 2. STEP: Initialize the date if it's the first time we see it
-        if date not in daily_data:
-            daily_data[date] = {
-                'revenue': 0.0,
-                'transaction_count': 0,
-                'customers': set()
-            }
-        # 3. STEP: Accumulate the values
-        daily_data[date]['revenue'] += revenue
-        daily_data[date]['transaction_count'] += 1
-        daily_data[date]['customers'].add(customer)
-    # 4. STEP: Finalize the data (Convert customer set to a count)
+    return _daily_trend(build_aggregate(transactions))
+
+def _daily_trend(aggregate):
     final_trend = {}
     # Sort by date string (e.g., '2024-12-01' comes before '2024-12-02')
-    for date in sorted(daily_data.keys()):
-        data = daily_data[date]
+    for date in sorted(aggregate['daily'].keys()):
+        data = aggregate['daily'][date]
         final_trend[date] = {
             'revenue': round(data['revenue'], 2),
             'transaction_count': data['transaction_count'],
-            # Count the unique IDs in our set
+            # Count the unique customer IDs
             'unique_customers': len(data['customers'])
         }
     return final_trend
@@ -135,20 +182,21 @@ def find_peak_sales_day(transactions):
     """
     Identifies the date with the highest revenue.
     """
-    # 1. STEP: Get the daily trends first
-    trend = daily_sales_trend(transactions)
+    return _peak_day(daily_sales_trend(transactions))
+
+def _peak_day(trend):
     if not trend:
         return None
     peak_date = ""
     max_revenue = -1.0
     tx_count = 0
-    # 2. STEP: Loop through each day to find the highest revenue
+    # 1. STEP: Loop through each day to find the highest revenue
     for date, metrics in trend.items():
         if metrics['revenue'] > max_revenue:
             max_revenue = metrics['revenue']
             peak_date = date
             tx_count = metrics['transaction_count']
-    # 3. STEP: Return as a tuple: (Date, Revenue, Count)
+    # 2. STEP: Return as a tuple: (Date, Revenue, Count)
     return (peak_date, max_revenue, tx_count)
 
 
@@ -157,23 +205,15 @@ def low_performing_products(transactions, threshold=10):
     """
     Identifies products with total quantity sold less than the threshold.
     """
-    # 1. STEP: Create a dictionary to count totals for every product
-    product_totals = {}
-    for tx in transactions:
-        name = tx['ProductName']
-        quantity = tx['Quantity']
-        revenue = tx['Quantity'] * tx['UnitPrice']
-        # 2. STEP: Aggregate data (Group by product name)
-        if name not in product_totals:
-            product_totals[name] = {'total_qty': 0, 'total_rev': 0.0}
-        product_totals[name]['total_qty'] += quantity
-        product_totals[name]['total_rev'] += revenue
-    # 3. STEP: Filter for "Low Sellers"
+    return _low_performers(build_aggregate(transactions), threshold)
+
+def _low_performers(aggregate, threshold):
+    # 1. STEP: Filter for "Low Sellers"
     low_performers = []
-    for name, data in product_totals.items():
+    for name, data in aggregate['products'].items():
         if data['total_qty'] < threshold:
-            low_performers.append((name, data['total_qty'], data['total_rev']))
-    # 4. STEP: Sort the final list by Quantity (ascending - lowest first)
+            low_performers.append((name, data['total_qty'], data['total_revenue']))
+    # 2. STEP: Sort the final list by Quantity (ascending - lowest first)
     # x[1] refers to the TotalQty in our tuple
     low_performers.sort(key=lambda x: x[1])
     return low_performers
@@ -186,19 +226,23 @@ def run_analytics(transactions, top_n=5, low_threshold=10):
     Run all analytics and store results in the global ANALYTICS_RESULTS.
     Returns the same dict for convenience.
     """
+    return run_analytics_from_aggregate(
+        build_aggregate(transactions), top_n=top_n, low_threshold=low_threshold)
+
+def run_analytics_from_aggregate(aggregate, top_n=5, low_threshold=10):
+    """
+    Same as run_analytics, for an aggregate that is already built (e.g. merged
+    from cached partitions).
+    """
     print("\n[5/10] Performing analytical calculations...")
     ANALYTICS_RESULTS.clear()
 
-    ANALYTICS_RESULTS["total_revenue"] = calculate_total_revenue(transactions)
-    ANALYTICS_RESULTS["region_wise_performance"] = region_wise_sales(
-        transactions)
-    ANALYTICS_RESULTS["top_selling_products"] = top_selling_products(
-        transactions, n=top_n)
-    ANALYTICS_RESULTS["top_customers"] = customer_analysis(transactions)
-    ANALYTICS_RESULTS["daily_sales_trend"] = daily_sales_trend(transactions)
-    ANALYTICS_RESULTS["peak_sales_day"] = find_peak_sales_day(transactions)
-    ANALYTICS_RESULTS["low_performers"] = low_performing_products(
-        transactions, threshold=low_threshold
-    )
+    ANALYTICS_RESULTS["total_revenue"] = _total_revenue(aggregate)
+    ANALYTICS_RESULTS["region_wise_performance"] = _region_performance(aggregate)
+    ANALYTICS_RESULTS["top_selling_products"] = _top_products(aggregate, top_n)
+    ANALYTICS_RESULTS["top_customers"] = _customer_stats(aggregate)
+    ANALYTICS_RESULTS["daily_sales_trend"] = _daily_trend(aggregate)
+    ANALYTICS_RESULTS["peak_sales_day"] = _peak_day(ANALYTICS_RESULTS["daily_sales_trend"])
+    ANALYTICS_RESULTS["low_performers"] = _low_performers(aggregate, low_threshold)
     print("✓ Analysis complete")
     return ANALYTICS_RESULTS
@@ -1,13 +1,15 @@
 from .data_processor import ANALYTICS_RESULTS
 from datetime import datetime
+import hashlib
 import os
 
-def read_sales_data(filename):
+def read_sales_data(filename, log=print):
     """
     Read raw sales transactions from a text file using common encodings.
+    Progress messages go through log; errors are always printed.
     """
     encodings = ['utf-8', 'latin-1', 'cp1252']
-    print("\n[1/10] Reading sales data...")
+    log("\n[1/10] Reading sales data...")
     for enc in encodings:
         try:
             with open(filename, 'r', encoding=enc) as f:
@@ -15,7 +17,7 @@ def read_sales_data(filename):
                 cleaned_lines = [
                     line.strip() for line in lines[1:] if line.strip()
                 ]
-                print(
+                log(
                     f"✓ Successfully read {len(cleaned_lines)} transactions")
                 return cleaned_lines
         except UnicodeDecodeError:
@@ -29,13 +31,87 @@ def read_sales_data(filename):
 
 # ========================================================================
 
+# Class that remembers which TransactionIDs have already been seen
+class TransactionIndex:
+    """
+    Index of TransactionIDs used to drop duplicates or apply corrections.
+
+    Only compact integer keys are kept, never the records themselves, so the
+    same index can be passed to validate_data for every file or chunk of a
+    stream while each call still returns only its own records.
+
+    on_duplicate: 'drop' keeps the first record seen for an ID,
+                  'replace' keeps the latest one (last-write-wins) within
+                  a validate_data call. Records already returned by an
+                  earlier call cannot be replaced, so a later copy is
+                  dropped; load_partition_aggregates applies last-write-wins
+                  across files.
+    """
+
+    def __init__(self, on_duplicate='drop'):
+        if on_duplicate not in ('drop', 'replace'):
+            raise ValueError("on_duplicate must be 'drop' or 'replace'")
+        self.on_duplicate = on_duplicate
+        self.duplicate_count = 0
+        self.corrected_count = 0
+        self._keys = set()
+
+    def add(self, transaction):
+        """
+        Record a transaction's ID, returning False if it was already seen.
+        """
+        key = _transaction_key(transaction['TransactionID'])
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def __contains__(self, tid):
+        return _transaction_key(tid) in self._keys
+
+    def keys(self):
+        """
+        Return the integer ID keys, e.g. to cache them with a partition.
+        """
+        return list(self._keys)
+
+    def add_keys(self, keys):
+        """
+        Add keys returned by keys() of another index.
+        """
+        self._keys.update(keys)
+
+    def count_known(self, keys):
+        """
+        Count how many of the given keys are already in the index.
+        """
+        return sum(1 for key in keys if key in self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+# Helper function to turn a TransactionID into a compact integer key
+def _transaction_key(tid):
+    # IDs like 'T018' become 1018 (the leading 1 keeps 'T018' != 'T18')
+    digits = tid[1:]
+    if tid[:1] == 'T' and digits.isdigit() and len(digits) <= 17:
+        return int('1' + digits)
+    # Anything else uses a 64-bit hash, kept negative so it cannot collide
+    # with the numeric keys above
+    digest = hashlib.blake2b(tid.encode('utf-8'), digest_size=8).digest()
+    return -1 - int.from_bytes(digest, 'big')
+
+# ========================================================================
+
 #  Function that parse the raw data and handle data quality issues.
-def parse_transactions(raw_lines):
+def parse_transactions(raw_lines, log=print):
     """
     Parse raw transaction lines into structured dictionaries.
+    Progress messages go through log.
     """
     parsed_data = []
-    print("\n[2/10] Parsing data...")
+    log("\n[2/10] Parsing data...")
     for line in raw_lines:
         # 1. Split by pipe delimiter '|'
         parts = line.split('|')
@@ -67,16 +143,22 @@ def parse_transactions(raw_lines):
 
         except (ValueError, TypeError):
             continue
-    print(f"✓ Parsed {len(parsed_data)} records")
+    log(f"✓ Parsed {len(parsed_data)} records")
     return parsed_data
 
 # ========================================================================
 
 #Function to validate data
-def validate_data(transactions):
+def validate_data(transactions, index=None):
     """
-    Validate parsed transactions and remove invalid records.
+    Validate parsed transactions and remove invalid and duplicate records.
+    Pass the same TransactionIndex for every file or chunk of a run; only
+    records that pass validation are added to it.
     """
+    if index is None:
+        index = TransactionIndex()
+    # Positions of this call's records, for last-write-wins within the batch
+    positions = {}
     valid_transactions = []
     invalid_count = 0
     total_input = len(transactions)
@@ -88,8 +170,15 @@ def validate_data(transactions):
                             tx['CustomerID'].startswith('C'))
         if missing_data or incorrect_number or incorrect_ID:
             invalid_count += 1
-        else:
+        elif index.add(tx):
+            positions[tx['TransactionID']] = len(valid_transactions)
             valid_transactions.append(tx)
+        elif index.on_duplicate == 'replace' and tx['TransactionID'] in positions:
+            # Repeated TransactionID: the later record is a correction
+            valid_transactions[positions[tx['TransactionID']]] = tx
+            index.corrected_count += 1
+        else:
+            index.duplicate_count += 1
     return valid_transactions, total_input, invalid_count
 
 #Function to display filter
@@ -190,16 +279,21 @@ def apply_amount_filter(valid_transactions, min_amount, max_amount):
     return amt_filtered_count
 
 #Function to validate, filter and make summary of the data
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, index=None):
     """
     Validate parsed transactions and apply optional region/amount filters.
+    Duplicate TransactionIDs are handled by index (see validate_data).
     """
-    valid_transactions, invalid_count, total_input = validate_data(transactions)
+    if index is None:
+        index = TransactionIndex()
+    valid_transactions, total_input, invalid_count = validate_data(transactions, index)
     print("-" * 30)
     print('Summary of valid records after cleaning the data:')
     # --- REQUIRED OUTPUT FORMAT ---
     print(f"Total records parsed: {total_input}")
     print(f"Invalid records removed: {invalid_count}")
+    print(f"Duplicate records removed: {index.duplicate_count}")
+    print(f"Corrected records (last-write-wins): {index.corrected_count}")
     print(f"Valid records after cleaning: {len(valid_transactions)}")
     print("-" * 30)
 
@@ -215,6 +309,8 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     filter_summary = {
         'Total_Input': total_input,
         'Invalid_Count': invalid_count,
+        'Duplicate_Count': index.duplicate_count,
+        'Corrected_Count': index.corrected_count,
         'Filtered_by_Region': region_filtered_count,
         'Filtered_by_Amount': amt_filtered_count,
         'Final_Count': len(valid_transactions)
@@ -230,18 +326,24 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 # ========================================================================
 
 #Function to generate sales report
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt', total_records=None, log=print):
     """
     Generate and save a formatted sales analytics report to a text file.
+    total_records overrides len(transactions), e.g. for reports built from
+    partition aggregates. Pass enriched_transactions=None to leave out the
+    API enrichment section when enrichment was not run. Messages go
+    through log.
     """
-    print("\n[9/10] Generating report...")
+    log("\n[9/10] Generating report...")
     try:
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        total_records = len(transactions)
+        if total_records is None:
+            total_records = len(transactions)
         # API Stats
-        matched = [et for et in enriched_transactions if et.get('API_Match')]
+        enriched = enriched_transactions or []
+        matched = [et for et in enriched if et.get('API_Match')]
         unmatched = list(
-            set(et['ProductName'] for et in enriched_transactions if not et.get('API_Match')))
+            set(et['ProductName'] for et in enriched if not et.get('API_Match')))
         success_rate = (len(matched) / total_records *
                         100) if total_records > 0 else 0
 
@@ -320,18 +422,19 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         report.append(f"Average Revenue per Region:    ₹{avg_reg_val:,.2f}\n")
 
         # 8. API ENRICHMENT SUMMARY
-        report.append("API ENRICHMENT SUMMARY")
-        report.append("--------------------------------------------")
-        report.append(f"Total products enriched: {len(matched)}")
-        report.append(f"Success rate percentage: {success_rate:.2f}%")
-        report.append(
-            f"Unenriched Products:     {', '.join(unmatched[:3])}...")
+        if enriched_transactions is not None:
+            report.append("API ENRICHMENT SUMMARY")
+            report.append("--------------------------------------------")
+            report.append(f"Total products enriched: {len(matched)}")
+            report.append(f"Success rate percentage: {success_rate:.2f}%")
+            report.append(
+                f"Unenriched Products:     {', '.join(unmatched[:3])}...")
         report.append("============================================")
 
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write("\n".join(report))
-        print(f"✓ Report saved to: {output_file}")
+        log(f"✓ Report saved to: {output_file}")
     except Exception as e:
-        print(f"✕ Report Error: {e}")
+        log(f"✕ Report Error: {e}")
 
 # ========================================================================
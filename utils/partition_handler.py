@@ -0,0 +1,247 @@
+from .file_handler import read_sales_data, parse_transactions, validate_data, TransactionIndex
+from .data_processor import build_aggregate, merge_aggregates, run_analytics_from_aggregate
+from datetime import date
+import glob
+import hashlib
+import json
+import os
+import re
+
+# Partition keys are read from the path, e.g.
+#   data/sales/sales_data_North_2024-12-01.txt
+#   data/sales/region=North/date=2024-12-01/sales_data.txt
+REGION_PATTERNS = [r'region=([A-Za-z]+)', r'_([A-Za-z]+)_\d{4}-\d{2}-\d{2}\.txt$']
+DATE_PATTERN = r'(\d{4}-\d{2}-\d{2})'
+
+#Function to find partition files in a directory or glob
+def discover_partitions(source):
+    """
+    Find sales files under a directory (recursively) or matching a glob,
+    and read their region/date partition keys from the path.
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '**', '*.txt'), recursive=True)
+    else:
+        paths = glob.glob(source)
+    partitions = []
+    for path in sorted(paths):
+        normalized = path.replace('\\', '/')
+        region = None
+        for pattern in REGION_PATTERNS:
+            match = re.search(pattern, normalized)
+            if match:
+                region = match.group(1).title()
+                break
+        date_match = re.search(DATE_PATTERN, normalized)
+        partitions.append({
+            'path': path,
+            'region': region,
+            'date': date_match.group(1) if date_match else None
+        })
+    return partitions
+
+# Helper function to fingerprint a file without reading it
+def file_fingerprint(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+# Helper functions to load/save the partition aggregate cache.
+# In memory, aggregates hold sets (see build_aggregate); on disk they are lists.
+def load_partition_cache(cache_file):
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    for entry in cache.values():
+        entry['aggregate'] = _aggregate_from_json(entry['aggregate'])
+        if entry.get('deduped'):
+            entry['deduped']['aggregate'] = _aggregate_from_json(entry['deduped']['aggregate'])
+    return cache
+
+def save_partition_cache(cache, cache_file):
+    folder = os.path.dirname(cache_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    data = {}
+    for path, entry in cache.items():
+        data[path] = dict(entry, aggregate=_aggregate_to_json(entry['aggregate']))
+        if entry.get('deduped'):
+            data[path]['deduped'] = dict(
+                entry['deduped'], aggregate=_aggregate_to_json(entry['deduped']['aggregate']))
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+def _aggregate_to_json(aggregate):
+    data = dict(aggregate)
+    data['customers'] = {
+        c_id: dict(c, products_bought=list(c['products_bought']))
+        for c_id, c in aggregate['customers'].items()}
+    data['daily'] = {
+        day: dict(d, customers=sorted(d['customers']))
+        for day, d in aggregate['daily'].items()}
+    return data
+
+def _aggregate_from_json(data):
+    aggregate = dict(data)
+    aggregate['customers'] = {
+        c_id: dict(c, products_bought=dict.fromkeys(c['products_bought']))
+        for c_id, c in data['customers'].items()}
+    aggregate['daily'] = {
+        day: dict(d, customers=set(d['customers']))
+        for day, d in data['daily'].items()}
+    return aggregate
+
+# Helper function to fingerprint a set of excluded TransactionID keys
+def _keys_fingerprint(keys):
+    return hashlib.sha1(','.join(map(str, sorted(keys))).encode('utf-8')).hexdigest()
+
+# ========================================================================
+
+# Helper function to discard per-file progress messages
+def _no_log(message):
+    pass
+
+# Helper function to parse, validate and summarise one partition file
+def _process_partition(path, index):
+    parsed = parse_transactions(read_sales_data(path, log=_no_log), log=_no_log)
+    valid, total_input, invalid_count = validate_data(parsed, index)
+    return valid, total_input, invalid_count
+
+#Function to load aggregates for the selected partitions
+def load_partition_aggregates(source, region=None, start_date=None, end_date=None,
+                              cache_file='data/partition_cache.json', on_duplicate='replace'):
+    """
+    Return one aggregate snapshot per selected partition, plus a summary
+    dict with partition, cache and duplicate counts.
+
+    Snapshots are cached by file fingerprint together with the partition's
+    TransactionID keys, so only new or changed files are parsed again.
+    A TransactionID that appears in several partitions is counted once:
+    with on_duplicate='replace' the latest partition (by date) wins, so a
+    late-arriving corrected export replaces the original; with 'drop' the
+    earliest one wins. A partition without its shared IDs is cached too,
+    keyed by the IDs it excludes. When region or a date range is given,
+    files without that key in their path are skipped.
+    """
+    print("\n[1/10] Loading partitioned sales data...")
+    cache = load_partition_cache(cache_file)
+    summary = {'partitions': 0, 'reused': 0, 'reprocessed': 0, 'rows_read': 0,
+               'duplicates_in_files': 0, 'corrections_in_files': 0,
+               'duplicates_across_files': 0, 'corrections_across_files': 0}
+    selected = []
+    # Valid records of files read in this run, so they are not read twice
+    fresh = {}
+    partitions = sorted(discover_partitions(source),
+                        key=lambda p: (p['date'] or '', p['path']))
+    for part in partitions:
+        # 1. STEP: Skip partitions outside the requested region/date range
+        if region and part['region'] != region.title():
+            continue
+        if start_date or end_date:
+            if part['date'] is None:
+                continue
+            if start_date and part['date'] < start_date:
+                continue
+            if end_date and part['date'] > end_date:
+                continue
+        # 2. STEP: Reuse the cached snapshot if the file has not changed
+        path = part['path']
+        fingerprint = file_fingerprint(path)
+        entry = cache.get(path)
+        if (entry and entry['fingerprint'] == fingerprint
+                and entry.get('on_duplicate') == on_duplicate):
+            summary['reused'] += 1
+        else:
+            # 3. STEP: Otherwise parse, validate and summarise the file again
+            index = TransactionIndex(on_duplicate)
+            valid, total_input, invalid_count = _process_partition(path, index)
+            entry = {
+                'fingerprint': fingerprint,
+                'on_duplicate': on_duplicate,
+                'region': part['region'],
+                'date': part['date'],
+                'total_input': total_input,
+                'invalid_count': invalid_count,
+                'duplicate_count': index.duplicate_count,
+                'corrected_count': index.corrected_count,
+                'keys': index.keys(),
+                'aggregate': build_aggregate(valid),
+                'deduped': None
+            }
+            cache[path] = entry
+            fresh[path] = valid
+            summary['reprocessed'] += 1
+            summary['rows_read'] += total_input
+        summary['partitions'] += 1
+        summary['duplicates_in_files'] += entry['duplicate_count']
+        summary['corrections_in_files'] += entry['corrected_count']
+        selected.append((path, entry))
+
+    # 4. STEP: Decide which partition owns each TransactionID
+    owners = {}
+    for position, (_, entry) in enumerate(selected):
+        for key in entry['keys']:
+            if on_duplicate == 'replace':
+                owners[key] = position
+            else:
+                owners.setdefault(key, position)
+
+    # 5. STEP: Leave out IDs owned by another partition
+    aggregates = []
+    for position, (path, entry) in enumerate(selected):
+        excluded_keys = [key for key in entry['keys'] if owners[key] != position]
+        if not excluded_keys:
+            aggregates.append(entry['aggregate'])
+            continue
+        if on_duplicate == 'replace':
+            summary['corrections_across_files'] += len(excluded_keys)
+        else:
+            summary['duplicates_across_files'] += len(excluded_keys)
+        excluded_fingerprint = _keys_fingerprint(excluded_keys)
+        deduped = entry.get('deduped')
+        if not deduped or deduped['excluded'] != excluded_fingerprint:
+            valid = fresh.get(path)
+            if valid is None:
+                valid, total_input, _ = _process_partition(path, TransactionIndex(on_duplicate))
+                summary['reprocessed'] += 1
+                summary['rows_read'] += total_input
+            excluded = TransactionIndex()
+            excluded.add_keys(excluded_keys)
+            deduped = {
+                'excluded': excluded_fingerprint,
+                'aggregate': build_aggregate(
+                    [tx for tx in valid if tx['TransactionID'] not in excluded])
+            }
+            entry['deduped'] = deduped
+        aggregates.append(deduped['aggregate'])
+
+    # 6. STEP: Forget files that no longer exist
+    for path in list(cache):
+        if not os.path.exists(path):
+            del cache[path]
+    save_partition_cache(cache, cache_file)
+    print(f"✓ Partitions: {summary['partitions']} | Reused from cache: {summary['reused']} | Reprocessed: {summary['reprocessed']} ({summary['rows_read']} rows read)")
+    print(f"✓ Duplicates removed: {summary['duplicates_in_files']} within files | {summary['duplicates_across_files']} across files")
+    print(f"✓ Corrections applied: {summary['corrections_in_files']} within files | {summary['corrections_across_files']} across files")
+    return aggregates, summary
+
+#Function to run month-to-date analytics over partitioned files
+def run_month_to_date(source, as_of=None, region=None,
+                      cache_file='data/partition_cache.json', on_duplicate='replace'):
+    """
+    Run analytics for the month of as_of (YYYY-MM-DD, default today) up to
+    and including that day, merging cached partition aggregates.
+    Returns the merged aggregate and the load summary.
+    """
+    try:
+        as_of_date = date.fromisoformat(as_of) if as_of else date.today()
+    except ValueError:
+        raise ValueError(f"Invalid date '{as_of}', expected YYYY-MM-DD")
+    aggregates, summary = load_partition_aggregates(
+        source, region=region, start_date=as_of_date.replace(day=1).isoformat(),
+        end_date=as_of_date.isoformat(), cache_file=cache_file, on_duplicate=on_duplicate)
+    merged = merge_aggregates(aggregates)
+    if merged['transaction_count']:
+        run_analytics_from_aggregate(merged)
+    return merged, summary
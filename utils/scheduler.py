@@ -0,0 +1,23 @@
+from concurrent.futures import Future
+import threading
+
+
+#Function to start a single task in the background
+def run_in_background(func, *args):
+    """
+    Start func(*args) on a daemon thread and return a Future for its result.
+    A daemon thread is used so that aborting the run (e.g. Ctrl+C at a
+    prompt) never waits on a slow network call.
+    """
+    future = Future()
+
+    def worker():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return future